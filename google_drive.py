@@ -1,15 +1,44 @@
 import os
-import io
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaIoBaseUpload
-from typing import List, Dict, Optional
-import mimetypes
+from googleapiclient.http import MediaFileUpload
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
+# MIME types of the note formats we upload, by file extension
+MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.bmp': 'image/bmp',
+    '.tif': 'image/tiff',
+    '.tiff': 'image/tiff',
+    '.pdf': 'application/pdf'
+}
+
+# Reasons returned with HTTP 403 when Drive throttles requests
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+# Maximum number of calls Drive accepts in a single batch request
+BATCH_REQUEST_LIMIT = 100
+
+# Files smaller than this are uploaded in one request instead of resumably
+RESUMABLE_UPLOAD_THRESHOLD = 5 * 1024 * 1024
+
+# Resumable upload chunk size (must be a multiple of 256 KB)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+def _escape_q(value: str) -> str:
+    """Escape a string for use inside a quoted Drive query literal"""
+    return value.replace('\\', '\\\\').replace("'", "\\'")
+
 class GoogleDriveManager:
     """
     Manages Google Drive operations for organizing notes by subject
@@ -18,6 +47,9 @@ class GoogleDriveManager:
     # If modifying these scopes, delete the file token.json.
     SCOPES = ['https://www.googleapis.com/auth/drive']
     
+    # Credentials shared by all instances in this process
+    _cached_creds = None
+    
     def __init__(self, credentials_file: str = 'credentials.json'):
         """
         Initialize Google Drive manager
@@ -26,19 +58,26 @@ class GoogleDriveManager:
             credentials_file: Path to Google credentials JSON file
         """
         self.credentials_file = credentials_file
+        self.creds = None
         self.service = None
+        self._local = threading.local()
+        # Maps (parent_folder_id or 'root', folder_name) to folder ID
+        self._folder_cache = {}
         self.authenticate()
     
     def authenticate(self):
         """Authenticate with Google Drive API"""
-        creds = None
+        # Reuse credentials already loaded by this instance or in this process
+        creds = self.creds or GoogleDriveManager._cached_creds
         # The file token.json stores the user's access and refresh tokens
-        if os.path.exists('token.json'):
+        if not creds and os.path.exists('token.json'):
             creds = Credentials.from_authorized_user_file('token.json', self.SCOPES)
         
         # If there are no (valid) credentials available, let the user log in.
         if not creds or not creds.valid:
+            previous_token = None
             if creds and creds.expired and creds.refresh_token:
+                previous_token = creds.to_json()
                 creds.refresh(Request())
             else:
                 if not os.path.exists(self.credentials_file):
@@ -51,17 +90,74 @@ class GoogleDriveManager:
                     self.credentials_file, self.SCOPES)
                 creds = flow.run_local_server(port=0)
             
-            # Save the credentials for the next run
-            with open('token.json', 'w') as token:
-                token.write(creds.to_json())
+            # Save the credentials for the next run if they changed
+            token_json = creds.to_json()
+            if token_json != previous_token:
+                with open('token.json', 'w') as token:
+                    token.write(token_json)
+        
+        GoogleDriveManager._cached_creds = creds
+        self.creds = creds
         
         try:
-            self.service = build('drive', 'v3', credentials=creds)
+            # Use the discovery document bundled with googleapiclient instead
+            # of downloading it, so there is nothing to cache either
+            self.service = build('drive', 'v3', credentials=creds,
+                                 static_discovery=True, cache_discovery=False)
             print("Successfully authenticated with Google Drive!")
         except HttpError as error:
             print(f'An error occurred: {error}')
             raise
     
+    def _get_thread_service(self):
+        """
+        Get a Drive service for the current thread
+        
+        The googleapiclient service (and its httplib2.Http) is not thread-safe,
+        so each worker thread builds and keeps its own instance.
+        
+        Returns:
+            Drive service bound to the current thread
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self.service
+        
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.creds,
+                            static_discovery=True, cache_discovery=False)
+            self._local.service = service
+        return service
+    
+    def _call_with_retry(self, func, max_retries: int = 5):
+        """
+        Call a Drive API function, backing off exponentially on rate limits
+        
+        Args:
+            func: Callable issuing the request (e.g. request.execute or request.next_chunk)
+            max_retries: Maximum number of retries before giving up
+            
+        Returns:
+            Return value of func
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                return func()
+            except HttpError as error:
+                if not self._is_rate_limited(error) or attempt == max_retries:
+                    raise
+                time.sleep(2 ** attempt + random.random())
+    
+    def _is_rate_limited(self, error: Exception) -> bool:
+        """Check whether a Drive API error is a rate limit that is worth retrying"""
+        if not isinstance(error, HttpError):
+            return False
+        status = error.resp.status
+        return status == 429 or (
+            status == 403 and
+            any(reason in str(error.content) for reason in RATE_LIMIT_REASONS)
+        )
+    
     def create_folder(self, folder_name: str, parent_folder_id: str = None) -> str:
         """
         Create a folder in Google Drive
@@ -94,6 +190,24 @@ class GoogleDriveManager:
             print(f'An error occurred: {error}')
             return None
     
+    def _folder_query(self, folder_name: str, parent_folder_id: str = None) -> str:
+        """
+        Build the Drive search query for a folder by name
+        
+        Args:
+            folder_name: Name of the folder
+            parent_folder_id: ID of parent folder (optional)
+            
+        Returns:
+            Drive query string
+        """
+        query = f"name='{_escape_q(folder_name)}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
+        
+        if parent_folder_id:
+            query += f" and '{parent_folder_id}' in parents"
+        
+        return query
+    
     def find_folder(self, folder_name: str, parent_folder_id: str = None) -> Optional[str]:
         """
         Find a folder by name
@@ -106,15 +220,11 @@ class GoogleDriveManager:
             ID of the folder if found, None otherwise
         """
         try:
-            query = f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-            
-            if parent_folder_id:
-                query += f" and '{parent_folder_id}' in parents"
-            
             results = self.service.files().list(
-                q=query,
+                q=self._folder_query(folder_name, parent_folder_id),
                 spaces='drive',
-                fields='files(id, name)'
+                pageSize=1,
+                fields='files(id)'
             ).execute()
             
             folders = results.get('files', [])
@@ -139,13 +249,147 @@ class GoogleDriveManager:
         Returns:
             ID of the folder
         """
+        cache_key = (parent_folder_id or 'root', folder_name)
+        folder_id = self._folder_cache.get(cache_key)
+        
+        if folder_id:
+            return folder_id
+        
         folder_id = self.find_folder(folder_name, parent_folder_id)
         
         if folder_id:
             print(f'Found existing folder: {folder_name}')
-            return folder_id
         else:
-            return self.create_folder(folder_name, parent_folder_id)
+            folder_id = self.create_folder(folder_name, parent_folder_id)
+        
+        if folder_id:
+            self._folder_cache[cache_key] = folder_id
+        return folder_id
+    
+    def get_or_create_folders(self, folder_names: List[str], parent_folder_id: str = None) -> Dict[str, str]:
+        """
+        Get or create several folders using batched Drive requests
+        
+        All lookups are sent in one batch request and all missing folders are
+        created in a second one, instead of two round-trips per folder.
+        
+        Args:
+            folder_names: Names of the folders
+            parent_folder_id: ID of parent folder (optional)
+            
+        Returns:
+            Dictionary mapping folder names to folder IDs (failed folders are omitted)
+        """
+        parent_key = parent_folder_id or 'root'
+        folder_ids = {}
+        names = []
+        
+        for name in dict.fromkeys(folder_names):
+            folder_id = self._folder_cache.get((parent_key, name))
+            if folder_id:
+                folder_ids[name] = folder_id
+            else:
+                names.append(name)
+        
+        # Indices of names whose lookup returned no folder, or failed,
+        # and of names whose creation was rate limited
+        not_found = set()
+        failed = set()
+        throttled = set()
+        
+        def lookup(index):
+            return self.service.files().list(
+                q=self._folder_query(names[index], parent_folder_id),
+                spaces='drive',
+                pageSize=1,
+                fields='files(id)'
+            )
+        
+        def record_lookup(index, response):
+            folders = response.get('files', [])
+            if folders:
+                print(f'Found existing folder: {names[index]}')
+                folder_ids[names[index]] = folders[0]['id']
+            else:
+                not_found.add(index)
+        
+        def on_find(request_id, response, exception):
+            if exception is not None:
+                failed.add(int(request_id))
+                return
+            record_lookup(int(request_id), response)
+        
+        def create(index):
+            folder_metadata = {
+                'name': names[index],
+                'mimeType': 'application/vnd.google-apps.folder'
+            }
+            if parent_folder_id:
+                folder_metadata['parents'] = [parent_folder_id]
+            return self.service.files().create(body=folder_metadata, fields='id')
+        
+        def record_create(index, response):
+            print(f'Folder created: {names[index]} (ID: {response["id"]})')
+            folder_ids[names[index]] = response['id']
+        
+        def on_create(request_id, response, exception):
+            if exception is not None:
+                # Throttled creates did not happen, so they are safe to retry
+                if self._is_rate_limited(exception):
+                    throttled.add(int(request_id))
+                else:
+                    print(f'An error occurred: {exception}')
+                return
+            record_create(int(request_id), response)
+        
+        # Look up all folders
+        for start in range(0, len(names), BATCH_REQUEST_LIMIT):
+            indices = range(start, min(start + BATCH_REQUEST_LIMIT, len(names)))
+            batch = self.service.new_batch_http_request(callback=on_find)
+            for index in indices:
+                batch.add(lookup(index), request_id=str(index))
+            try:
+                batch.execute()
+            except HttpError as error:
+                print(f'An error occurred: {error}')
+                failed.update(index for index in indices
+                              if index not in not_found and names[index] not in folder_ids)
+        
+        # Retry failed lookups one at a time, backing off on rate limits;
+        # names that still fail are skipped rather than created as duplicates
+        for index in sorted(failed):
+            try:
+                record_lookup(index, self._call_with_retry(lookup(index).execute))
+            except HttpError as error:
+                print(f'An error occurred: {error}')
+        
+        # Create the ones that do not exist yet
+        missing = sorted(not_found)
+        for start in range(0, len(missing), BATCH_REQUEST_LIMIT):
+            indices = missing[start:start + BATCH_REQUEST_LIMIT]
+            batch = self.service.new_batch_http_request(callback=on_create)
+            for index in indices:
+                batch.add(create(index), request_id=str(index))
+            try:
+                batch.execute()
+            except HttpError as error:
+                if self._is_rate_limited(error):
+                    throttled.update(index for index in indices if names[index] not in folder_ids)
+                else:
+                    print(f'An error occurred: {error}')
+        
+        # Retry rate-limited creates one at a time, backing off like lookups
+        for index in sorted(throttled):
+            try:
+                record_create(index, self._call_with_retry(create(index).execute))
+            except HttpError as error:
+                print(f'An error occurred: {error}')
+        
+        for name in names:
+            if name in folder_ids:
+                self._folder_cache[(parent_key, name)] = folder_ids[name]
+        
+        return folder_ids
     
     def upload_file(self, file_path: str, folder_id: str, filename: str = None) -> Optional[str]:
         """
@@ -160,18 +404,12 @@ class GoogleDriveManager:
             ID of the uploaded file
         """
         try:
-            if not os.path.exists(file_path):
-                print(f"File not found: {file_path}")
-                return None
-            
             # Determine filename
             if filename is None:
                 filename = os.path.basename(file_path)
             
             # Determine MIME type
-            mime_type, _ = mimetypes.guess_type(file_path)
-            if mime_type is None:
-                mime_type = 'application/octet-stream'
+            mime_type = MIME_TYPES.get(os.path.splitext(file_path)[1].lower(), 'application/octet-stream')
             
             # Prepare file metadata
             file_metadata = {
@@ -179,19 +417,37 @@ class GoogleDriveManager:
                 'parents': [folder_id]
             }
             
-            # Upload file
-            with open(file_path, 'rb') as file:
-                media = MediaIoBaseUpload(
-                    file,
+            service = self._get_thread_service()
+            
+            # Small files go up in a single multipart request, larger ones
+            # resumably in chunks streamed lazily from disk
+            try:
+                resumable = os.path.getsize(file_path) >= RESUMABLE_UPLOAD_THRESHOLD
+                media = MediaFileUpload(
+                    file_path,
                     mimetype=mime_type,
-                    resumable=True
+                    chunksize=UPLOAD_CHUNK_SIZE,
+                    resumable=resumable
                 )
-                
-                file_obj = self.service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id'
-                ).execute()
+            except OSError as error:
+                print(f"Could not read file {file_path}: {error}")
+                return None
+            
+            request = service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id'
+            )
+            
+            if resumable:
+                # Upload chunk by chunk so each one can be retried
+                file_obj = None
+                while file_obj is None:
+                    status, file_obj = self._call_with_retry(request.next_chunk)
+                    if status:
+                        print(f'Uploading {filename}: {int(status.progress() * 100)}%')
+            else:
+                file_obj = self._call_with_retry(request.execute)
             
             print(f'File uploaded: {filename} (ID: {file_obj["id"]})')
             return file_obj.get('id')
@@ -200,59 +456,104 @@ class GoogleDriveManager:
             print(f'An error occurred: {error}')
             return None
     
-    def upload_multiple_files(self, file_paths: List[str], folder_id: str) -> List[Optional[str]]:
+    def _upload_in_parallel(self, uploads: List[Tuple[str, str, Optional[str]]],
+                            max_workers: int = 8) -> List[Optional[str]]:
+        """
+        Upload files concurrently using a bounded thread pool
+        
+        Args:
+            uploads: List of tuples (file_path, folder_id, filename)
+            max_workers: Maximum number of concurrent uploads
+            
+        Returns:
+            List of uploaded file IDs, in the same order as uploads
+        """
+        file_ids = [None] * len(uploads)
+        
+        if not uploads:
+            return file_ids
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.upload_file, file_path, folder_id, filename): index
+                for index, (file_path, folder_id, filename) in enumerate(uploads)
+            }
+            
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    file_ids[index] = future.result()
+                except Exception as e:
+                    print(f"Error uploading {uploads[index][0]}: {str(e)}")
+        
+        return file_ids
+    
+    def upload_multiple_files(self, file_paths: List[str], folder_id: str,
+                              max_workers: int = 8) -> List[Optional[str]]:
         """
         Upload multiple files to Google Drive
         
         Args:
             file_paths: List of file paths to upload
             folder_id: ID of the destination folder
+            max_workers: Maximum number of concurrent uploads
             
         Returns:
             List of uploaded file IDs
         """
-        file_ids = []
-        
-        for file_path in file_paths:
-            file_id = self.upload_file(file_path, folder_id)
-            file_ids.append(file_id)
-        
-        return file_ids
+        uploads = [(file_path, folder_id, None) for file_path in file_paths]
+        return self._upload_in_parallel(uploads, max_workers)
     
-    def organize_notes_by_subject(self, notes_data: List[Dict], base_folder_id: str = None) -> Dict[str, List[str]]:
+    def organize_notes_by_subject(self, notes_data: List[Dict], base_folder_id: str = None,
+                                  max_workers: int = 8) -> Dict[str, List[str]]:
         """
         Organize notes by subject in Google Drive
         
         Args:
             notes_data: List of dictionaries with 'image_path', 'subject', 'text' keys
             base_folder_id: ID of base folder (optional)
+            max_workers: Maximum number of concurrent uploads
             
         Returns:
             Dictionary mapping subjects to lists of uploaded file IDs
         """
         organized_files = {}
+        uploads = []
+        subjects = []
+        
+        # Resolve all subject folders up front with batched requests
+        subject_folder_ids = self.get_or_create_folders(
+            [note.get('subject', 'unknown') for note in notes_data if note.get('image_path')],
+            base_folder_id
+        )
+        
+        # One timestamp for the whole batch so its files sort together
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         for note in notes_data:
             image_path = note.get('image_path')
             subject = note.get('subject', 'unknown')
             text = note.get('text', '')
             
-            if not image_path or not os.path.exists(image_path):
+            # Notes come from successful OCR runs, so the file is known to exist
+            if not image_path:
                 continue
             
-            # Create or get subject folder
-            subject_folder_id = self.get_or_create_folder(subject, base_folder_id)
+            subject_folder_id = subject_folder_ids.get(subject)
             
             if subject_folder_id is None:
                 print(f"Failed to create folder for subject: {subject}")
                 continue
             
             # Upload file with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{subject}_{timestamp}_{os.path.basename(image_path)}"
             
-            file_id = self.upload_file(image_path, subject_folder_id, filename)
-            
+            uploads.append((image_path, subject_folder_id, filename))
+            subjects.append(subject)
+        
+        file_ids = self._upload_in_parallel(uploads, max_workers)
+        
+        for subject, file_id in zip(subjects, file_ids):
             if file_id:
                 if subject not in organized_files:
                     organized_files[subject] = []
@@ -260,24 +561,37 @@ class GoogleDriveManager:
         
         return organized_files
     
-    def list_files_in_folder(self, folder_id: str) -> List[Dict]:
+    def list_files_in_folder(self, folder_id: str,
+                             fields: str = 'files(id, name, mimeType, createdTime, size)') -> List[Dict]:
         """
         List all files in a folder
         
         Args:
             folder_id: ID of the folder
+            fields: Drive fields selector for the returned files
             
         Returns:
             List of file information dictionaries
         """
         try:
-            results = self.service.files().list(
-                q=f"'{folder_id}' in parents and trashed=false",
-                spaces='drive',
-                fields='files(id, name, mimeType, createdTime, size)'
-            ).execute()
-            
-            return results.get('files', [])
+            files = []
+            page_token = None
+            
+            # Follow nextPageToken so large folders are not truncated
+            while True:
+                results = self.service.files().list(
+                    q=f"'{folder_id}' in parents and trashed=false",
+                    spaces='drive',
+                    pageSize=1000,
+                    fields=f'nextPageToken, {fields}',
+                    pageToken=page_token
+                ).execute()
+                
+                files.extend(results.get('files', []))
+                page_token = results.get('nextPageToken')
+                
+                if not page_token:
+                    return files
             
         except HttpError as error:
             print(f'An error occurred: {error}')
@@ -296,6 +610,10 @@ class GoogleDriveManager:
         try:
             self.service.files().delete(fileId=file_id).execute()
             print(f'File deleted: {file_id}')
+            
+            # Drop cached lookups pointing at the deleted folder
+            for key in [key for key, value in self._folder_cache.items() if value == file_id]:
+                self._folder_cache.pop(key)
             return True
             
         except HttpError as error:
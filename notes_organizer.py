@@ -1,31 +1,61 @@
 import os
-import glob
+import multiprocessing
 from typing import List, Dict, Tuple
 import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import cv2
+
 from ocr_processor import OCRProcessor
 from text_classifier import TextClassifier
 from google_drive import GoogleDriveManager
 
+# OCR processor owned by each worker process, set up by _init_ocr_worker
+_worker_ocr_processor = None
+
+def _init_ocr_worker(tesseract_path: str = None, target_long_edge: int = None, config: str = None):
+    """Create the OCR processor for a worker process, configured like the parent's"""
+    global _worker_ocr_processor
+    # Parallelism comes from the pool; one thread per worker avoids oversubscribing the CPUs
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    cv2.setNumThreads(1)
+    _worker_ocr_processor = OCRProcessor(tesseract_path, target_long_edge, config)
+
+def _ocr_worker(image_path: str) -> Tuple[str, float]:
+    """Extract text and OCR confidence from an image in a worker process"""
+    return _worker_ocr_processor.extract_text_and_confidence(image_path)
+
 class NotesOrganizer:
     """
     Main class that coordinates OCR, text classification, and Google Drive organization
     """
     
-    def __init__(self, tesseract_path: str = None, credentials_file: str = 'credentials.json'):
+    def __init__(self, tesseract_path: str = None, credentials_file: str = 'credentials.json',
+                 embedding_model_name: str = None, onnx_model_dir: str = None,
+                 quantize_weights: bool = False):
         """
         Initialize Notes Organizer
         
         Args:
             tesseract_path: Path to tesseract executable
             credentials_file: Path to Google credentials file
+            embedding_model_name: sentence-transformers model to classify with (optional)
+            onnx_model_dir: ONNX export of the zero-shot model to use on CPU (optional)
+            quantize_weights: Quantize the zero-shot model to int8 on GPU
         """
         print("Initializing Notes Organizer...")
         
+        self.tesseract_path = tesseract_path
+        
         # Initialize components
         self.ocr_processor = OCRProcessor(tesseract_path)
-        self.text_classifier = TextClassifier()
+        self.text_classifier = TextClassifier(
+            embedding_model_name=embedding_model_name,
+            onnx_model_dir=onnx_model_dir,
+            quantize_weights=quantize_weights
+        )
         self.drive_manager = GoogleDriveManager(credentials_file)
         
         print("Notes Organizer initialized successfully!")
@@ -43,9 +73,34 @@ class NotesOrganizer:
         """
         print(f"Processing image: {image_path}")
         
-        # Extract text using OCR
-        extracted_text = self.ocr_processor.extract_text(image_path)
+        # Extract text and OCR confidence in a single pass
+        extracted_text, ocr_confidence = self.ocr_processor.extract_text_and_confidence(image_path)
+        
+        subject, classification_confidence = 'unknown', 0.0
+        if extracted_text.strip():
+            # Classify the extracted text
+            subject, classification_confidence = self.text_classifier.classify_text(
+                extracted_text, confidence_threshold
+            )
         
+        return self._build_result(image_path, extracted_text, ocr_confidence,
+                                  subject, classification_confidence)
+    
+    def _build_result(self, image_path: str, extracted_text: str, ocr_confidence: float,
+                      subject: str, classification_confidence: float) -> Dict:
+        """
+        Build the processing result for an image
+        
+        Args:
+            image_path: Path to the image file
+            extracted_text: Text extracted by OCR
+            ocr_confidence: OCR confidence score
+            subject: Classified subject
+            classification_confidence: Classification confidence score
+            
+        Returns:
+            Dictionary with processing results
+        """
         if not extracted_text.strip():
             print(f"No text extracted from {image_path}")
             return {
@@ -57,14 +112,6 @@ class NotesOrganizer:
                 'status': 'no_text_extracted'
             }
         
-        # Get OCR confidence
-        ocr_confidence = self.ocr_processor.get_text_confidence(image_path)
-        
-        # Classify the extracted text
-        subject, classification_confidence = self.text_classifier.classify_text(
-            extracted_text, confidence_threshold
-        )
-        
         result = {
             'image_path': image_path,
             'text': extracted_text,
@@ -77,23 +124,52 @@ class NotesOrganizer:
         print(f"Classification result: {subject} (confidence: {classification_confidence:.2f})")
         return result
     
-    def process_multiple_images(self, image_paths: List[str], confidence_threshold: float = 0.3) -> List[Dict]:
+    def process_multiple_images(self, image_paths: List[str], confidence_threshold: float = 0.3,
+                                max_workers: int = None) -> List[Dict]:
         """
         Process multiple images
         
+        OCR runs in a pool of worker processes. Classification is deferred
+        until all texts are extracted and then done in a single batch in this
+        process, so the model is only loaded once.
+        
         Args:
             image_paths: List of image file paths
             confidence_threshold: Minimum confidence for classification
+            max_workers: Number of OCR worker processes (default: CPU count)
             
         Returns:
             List of processing results
         """
+        if len(image_paths) <= 1:
+            return [self.process_single_image(image_path, confidence_threshold) for image_path in image_paths]
+        
+        print(f"\nExtracting text from {len(image_paths)} images...")
+        
+        # Spawned rather than forked, since the parent may already run torch threads
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_ocr_worker,
+                                 initargs=(self.tesseract_path,
+                                           self.ocr_processor.target_long_edge,
+                                           self.ocr_processor.config)) as executor:
+            ocr_results = list(executor.map(_ocr_worker, image_paths))
+        
+        # Classify all non-empty texts at once
+        texts = [text for text, _ in ocr_results if text.strip()]
+        classifications = iter(self.text_classifier.classify_batch(texts, confidence_threshold))
+        
         results = []
         
-        for i, image_path in enumerate(image_paths, 1):
+        for i, (image_path, (extracted_text, ocr_confidence)) in enumerate(zip(image_paths, ocr_results), 1):
             print(f"\nProcessing image {i}/{len(image_paths)}: {os.path.basename(image_path)}")
             
-            result = self.process_single_image(image_path, confidence_threshold)
+            subject, classification_confidence = 'unknown', 0.0
+            if extracted_text.strip():
+                subject, classification_confidence = next(classifications)
+            
+            result = self._build_result(image_path, extracted_text, ocr_confidence,
+                                        subject, classification_confidence)
             results.append(result)
         
         return results
@@ -154,14 +230,15 @@ class NotesOrganizer:
         if file_extensions is None:
             file_extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff', '*.tif']
         
-        # Find all image files
-        image_paths = []
-        for ext in file_extensions:
-            pattern = os.path.join(directory_path, ext)
-            image_paths.extend(glob.glob(pattern))
-            # Also check for uppercase extensions
-            pattern = os.path.join(directory_path, ext.upper())
-            image_paths.extend(glob.glob(pattern))
+        # Find all image files in a single directory pass (case-insensitive);
+        # hidden files such as macOS AppleDouble ._ files are skipped like glob does
+        exts = {'.' + ext.lower().lstrip('*.') for ext in file_extensions}
+        with os.scandir(directory_path) as entries:
+            image_paths = [
+                entry.path for entry in entries
+                if not entry.name.startswith('.') and entry.is_file()
+                and os.path.splitext(entry.name)[1].lower() in exts
+            ]
         
         if not image_paths:
             print(f"No image files found in {directory_path}")
@@ -193,24 +270,31 @@ class NotesOrganizer:
             Summary dictionary
         """
         total_images = len(processing_results)
-        successful_extractions = sum(1 for r in processing_results if r['status'] == 'success')
-        successful_classifications = sum(1 for r in processing_results if r['subject'] != 'unknown')
+        successful_extractions = 0
+        successful_classifications = 0
+        subject_counts = Counter()
+        ocr_sum = 0
+        conf_sum = 0
         
-        # Subject distribution
-        subject_counts = {}
+        # Gather all statistics in a single pass
         for result in processing_results:
-            subject = result['subject']
-            subject_counts[subject] = subject_counts.get(subject, 0) + 1
+            if result['status'] == 'success':
+                successful_extractions += 1
+            if result['subject'] != 'unknown':
+                successful_classifications += 1
+            subject_counts[result['subject']] += 1
+            ocr_sum += result['ocr_confidence']
+            conf_sum += result['confidence']
         
         # Average confidences
-        avg_ocr_confidence = sum(r['ocr_confidence'] for r in processing_results) / total_images if total_images > 0 else 0
-        avg_classification_confidence = sum(r['confidence'] for r in processing_results) / total_images if total_images > 0 else 0
+        avg_ocr_confidence = ocr_sum / total_images if total_images > 0 else 0
+        avg_classification_confidence = conf_sum / total_images if total_images > 0 else 0
         
         return {
             'total_images': total_images,
             'successful_extractions': successful_extractions,
             'successful_classifications': successful_classifications,
-            'subject_distribution': subject_counts,
+            'subject_distribution': dict(subject_counts),
             'average_ocr_confidence': avg_ocr_confidence,
             'average_classification_confidence': avg_classification_confidence
         }
@@ -223,11 +307,15 @@ def main():
     parser.add_argument('--confidence', type=float, default=0.3, help='Classification confidence threshold')
     parser.add_argument('--tesseract', help='Path to tesseract executable')
     parser.add_argument('--credentials', default='credentials.json', help='Google credentials file path')
+    parser.add_argument('--embedding-model', help='Classify with a sentence-transformers model (e.g. all-MiniLM-L6-v2)')
+    parser.add_argument('--onnx-model', help='Directory with an ONNX export of the classification model (used on CPU)')
+    parser.add_argument('--quantize', action='store_true', help='Quantize the classification model to int8 on GPU')
     
     args = parser.parse_args()
     
     # Initialize organizer
-    organizer = NotesOrganizer(args.tesseract, args.credentials)
+    organizer = NotesOrganizer(args.tesseract, args.credentials, args.embedding_model, args.onnx_model,
+                               args.quantize)
     
     # Process input
     if os.path.isfile(args.input):
@@ -2,26 +2,68 @@ import cv2
 import pytesseract
 import numpy as np
 from PIL import Image
-import os
-from typing import List, Tuple
+import re
+import threading
+from typing import List, Optional, Tuple
 
 class OCRProcessor:
     """
     Handles OCR processing of handwritten notes using Tesseract
     """
     
-    def __init__(self, tesseract_path: str = None):
+    # Runs of whitespace collapsed by clean_text
+    _WS_RE = re.compile(r'\s+')
+    
+    # Common OCR artifacts and their replacements
+    _ARTIFACT_TBL = str.maketrans({'|': 'I'})
+    
+    # Images with a longer edge than this (in pixels) are downscaled before OCR
+    target_long_edge = 2000
+    
+    # LSTM engine only, single column of text of variable sizes
+    DEFAULT_CONFIG = '--oem 1 --psm 4 -l eng'
+    
+    def __init__(self, tesseract_path: str = None, target_long_edge: int = None, config: str = None):
         """
         Initialize OCR processor
         
         Args:
             tesseract_path: Path to tesseract executable (if not in PATH)
+            target_long_edge: Maximum long edge in pixels before downscaling (optional)
+            config: Tesseract config string (optional, e.g. to add a character whitelist)
         """
         if tesseract_path:
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
         
+        if target_long_edge:
+            self.target_long_edge = target_long_edge
+        
+        # Per-thread scratch buffers reused across preprocess_image calls
+        self._buffers = threading.local()
+        
         # Configure Tesseract for better handwriting recognition
-        self.config = '--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,!?;:()[]{}"\'-+=/* '
+        self.config = config if config is not None else self.DEFAULT_CONFIG
+    
+    def read_grayscale(self, image_path: str) -> Optional[np.ndarray]:
+        """
+        Read an image from disk decoded straight to grayscale
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Grayscale image, or None if the file could not be read
+        """
+        # np.fromfile also handles non-ASCII paths that cv2.imread fails on
+        try:
+            buf = np.fromfile(image_path, dtype=np.uint8)
+        except OSError:
+            return None
+        
+        if buf.size == 0:
+            return None
+        
+        return cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE)
     
     def preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """
@@ -33,23 +75,42 @@ class OCRProcessor:
         Returns:
             Preprocessed image
         """
-        # Convert to grayscale
+        # Convert to grayscale (OpenCV reallocates dst only if the shape changed)
         if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            buffers = self._buffers
+            gray = buffers.gray = cv2.cvtColor(
+                image, cv2.COLOR_BGR2GRAY, dst=getattr(buffers, 'gray', None)
+            )
         else:
             gray = image
         
+        return self.preprocess_gray(gray)
+    
+    def preprocess_gray(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Preprocess a grayscale image for better OCR results
+        
+        Args:
+            gray: Grayscale image as numpy array
+            
+        Returns:
+            Preprocessed image
+        """
+        # Downscale very large images; extra resolution only slows Tesseract down
+        scale = min(1.0, self.target_long_edge / max(gray.shape[:2]))
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
         # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        buffers = self._buffers
+        blurred = buffers.blurred = cv2.GaussianBlur(
+            gray, (5, 5), 0, dst=getattr(buffers, 'blurred', None)
+        )
         
         # Apply thresholding to get binary image
         _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
-        # Apply morphological operations to clean up the image
-        kernel = np.ones((1, 1), np.uint8)
-        cleaned = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-        
-        return cleaned
+        return thresh
     
     def extract_text(self, image_path: str) -> str:
         """
@@ -63,12 +124,12 @@ class OCRProcessor:
         """
         try:
             # Read image
-            image = cv2.imread(image_path)
-            if image is None:
+            gray = self.read_grayscale(image_path)
+            if gray is None:
                 raise ValueError(f"Could not read image: {image_path}")
             
             # Preprocess image
-            processed_image = self.preprocess_image(image)
+            processed_image = self.preprocess_gray(gray)
             
             # Extract text using Tesseract
             text = pytesseract.image_to_string(processed_image, config=self.config)
@@ -94,13 +155,10 @@ class OCRProcessor:
         """
         results = []
         
+        # extract_text reports unreadable or missing files and returns ""
         for image_path in image_paths:
-            if os.path.exists(image_path):
-                text = self.extract_text(image_path)
-                results.append((image_path, text))
-            else:
-                print(f"Image file not found: {image_path}")
-                results.append((image_path, ""))
+            text = self.extract_text(image_path)
+            results.append((image_path, text))
         
         return results
     
@@ -115,14 +173,14 @@ class OCRProcessor:
             Cleaned text
         """
         # Remove extra whitespace
-        text = ' '.join(text.split())
+        text = self._WS_RE.sub(' ', text)
         
         # Remove common OCR artifacts
-        text = text.replace('|', 'I')
-        text = text.replace('0', 'O')  # Be careful with this one
+        text = text.translate(self._ARTIFACT_TBL)
         
-        # Remove non-printable characters
-        text = ''.join(char for char in text if char.isprintable())
+        # Remove non-printable characters (rare, so only scan when present)
+        if not text.isprintable():
+            text = ''.join(char for char in text if char.isprintable())
         
         return text.strip()
     
@@ -137,11 +195,11 @@ class OCRProcessor:
             Confidence score (0-100)
         """
         try:
-            image = cv2.imread(image_path)
-            if image is None:
+            gray = self.read_grayscale(image_path)
+            if gray is None:
                 return 0.0
             
-            processed_image = self.preprocess_image(image)
+            processed_image = self.preprocess_gray(gray)
             
             # Get OCR data with confidence scores
             data = pytesseract.image_to_data(processed_image, config=self.config, output_type=pytesseract.Output.DICT)
@@ -156,4 +214,47 @@ class OCRProcessor:
                 
         except Exception as e:
             print(f"Error getting confidence for {image_path}: {str(e)}")
-            return 0.0 
\ No newline at end of file
+            return 0.0
+    
+    def extract_text_and_confidence(self, image_path: str) -> Tuple[str, float]:
+        """
+        Extract text and its confidence score with a single Tesseract run
+        
+        The image is read and preprocessed once, and both the text and the
+        word confidences come from the same image_to_data call.
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Tuple of (extracted_text, confidence_score (0-100))
+        """
+        try:
+            gray = self.read_grayscale(image_path)
+            if gray is None:
+                raise ValueError(f"Could not read image: {image_path}")
+            
+            processed_image = self.preprocess_gray(gray)
+            
+            # Get OCR data with words and confidence scores
+            data = pytesseract.image_to_data(processed_image, config=self.config, output_type=pytesseract.Output.DICT)
+            
+            # Keep only recognized words
+            words = []
+            confidences = []
+            for word, conf in zip(data['text'], data['conf']):
+                conf = float(conf)
+                if conf > 0:
+                    words.append(word)
+                    confidences.append(conf)
+            
+            text = self.clean_text(' '.join(words))
+            
+            if confidences:
+                return text, sum(confidences) / len(confidences)
+            else:
+                return text, 0.0
+                
+        except Exception as e:
+            print(f"Error processing image {image_path}: {str(e)}")
+            return "", 0.0
\ No newline at end of file
@@ -6,6 +6,8 @@ Sets up Google Drive authentication for the Notes Organizer
 
 import os
 import json
+import argparse
+import functools
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
@@ -14,8 +16,23 @@ from google.oauth2.credentials import Credentials
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
-def setup_google_drive():
-    """Set up Google Drive authentication"""
+@functools.lru_cache(maxsize=1)
+def _load_creds(mtime: float) -> Credentials:
+    """
+    Load credentials from token.json, parsing it again only when it changes
+    
+    Args:
+        mtime: Modification time of token.json, used as the cache key
+    """
+    return Credentials.from_authorized_user_file('token.json', SCOPES)
+
+def setup_google_drive(verify_connection: bool = False):
+    """
+    Set up Google Drive authentication
+    
+    Args:
+        verify_connection: Also make a test request to Google Drive
+    """
     creds = None
     
     # Check if credentials.json exists
@@ -34,7 +51,7 @@ def setup_google_drive():
     
     # The file token.json stores the user's access and refresh tokens
     if os.path.exists('token.json'):
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
+        creds = _load_creds(os.path.getmtime('token.json'))
     
     # If there are no (valid) credentials available, let the user log in
     if not creds or not creds.valid:
@@ -50,22 +67,27 @@ def setup_google_drive():
         
         print("Authentication successful!")
     
-    # Test the connection
-    try:
-        service = build('drive', 'v3', credentials=creds)
-        results = service.files().list(pageSize=10).execute()
-        files = results.get('files', [])
-        print(f"Connection test successful! Found {len(files)} items in your Drive root.")
-    except Exception as e:
-        print(f"Connection test failed: {str(e)}")
-        return False
+    # Test the connection (skipped by default to avoid a network round-trip)
+    if verify_connection:
+        try:
+            service = build('drive', 'v3', credentials=creds,
+                            static_discovery=True, cache_discovery=False)
+            service.files().list(pageSize=1, fields='files(id)').execute()
+            print("Connection test successful!")
+        except Exception as e:
+            print(f"Connection test failed: {str(e)}")
+            return False
     
     print("Setup completed successfully!")
     return True
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Set up Google Drive authentication for the Notes Organizer')
+    parser.add_argument('--verify-connection', action='store_true', help='Make a test request to Google Drive')
+    args = parser.parse_args()
+    
     try:
-        if setup_google_drive():
+        if setup_google_drive(args.verify_connection):
             print("Google Drive setup completed successfully!")
         else:
             print("Google Drive setup failed!")
@@ -1,25 +1,77 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-import torch
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 import re
+import functools
+import threading
+from collections import Counter
+
+# Characters removed from text before classification
+_CLEAN_RE = re.compile(r'[^\w\s\.\,\!\?\;\:\-\(\)\[\]\{\}]')
+
+# Words in subject descriptions that say nothing about the subject
+_STOPWORDS = {'and', 'the', 'of', 'in', 'to', 'for', 'on', 'with', 'by', 'from'}
+
+# Punctuation stripped from words before keyword lookup
+_WORD_PUNCTUATION = '.,!?;:-()[]{}'
 
 class TextClassifier:
     """
     AI-powered text classifier for categorizing notes into subjects
     """
     
-    def __init__(self, model_name: str = "facebook/bart-large-mnli"):
+    # A keyword match is decisive with at least this many distinct keywords for
+    # the top subject and this many times as many as the runner-up
+    KEYWORD_MIN_HITS = 3
+    KEYWORD_MIN_RATIO = 2
+    # Confidence reported for a decisive keyword match. Hit counts are not on the
+    # scale of the model's softmax scores, so a fixed, moderate value is used;
+    # thresholds above it send the text to the model instead
+    KEYWORD_CONFIDENCE = 0.5
+    
+    # Premises are cut to this many characters and tokens; the topic of a
+    # note is clear long before that, and attention cost grows quadratically
+    MAX_TEXT_CHARS = 2000
+    MAX_PREMISE_TOKENS = 256
+    
+    # Default number of premise/hypothesis pairs per NLI forward pass; every
+    # text is paired with each subject, so this covers only a few texts
+    NLI_BATCH_PAIRS = 40
+    
+    # Loaded models shared by all instances, keyed by
+    # (model_name, embedding_model_name, onnx_model_dir, quantize_weights)
+    _MODEL_CACHE = {}
+    _MODEL_LOCK = threading.Lock()
+    
+    def __init__(self, model_name: str = "facebook/bart-large-mnli", embedding_model_name: str = None,
+                 onnx_model_dir: str = None, quantize_weights: bool = False):
         """
         Initialize text classifier
         
         Args:
             model_name: HuggingFace model name for zero-shot classification
+            embedding_model_name: sentence-transformers model name (optional). When given,
+                texts are classified by cosine similarity to the subject descriptions
+                (one forward pass per text) instead of zero-shot NLI
+            onnx_model_dir: Directory with an ONNX export of the zero-shot model (optional).
+                Used through ONNX Runtime when no GPU is available
+            quantize_weights: Quantize the zero-shot model's weights to int8 on GPU
+                (requires optimum-quanto)
         """
         self.model_name = model_name
-        self.classifier = None
+        self.embedding_model_name = embedding_model_name
+        self.onnx_model_dir = onnx_model_dir
+        self.quantize_weights = quantize_weights
+        self.encoder = None
+        # Normalized embeddings of the subject descriptions, used with self.encoder
+        self._subject_embeddings = None
         self.tokenizer = None
         self.model = None
+        self.device = -1
+        # Whether self.model is compiled with torch.compile
+        self._compiled = False
+        # Token IDs of each subject's hypothesis, cached by _cache_hypotheses
+        self._hypothesis_ids = None
+        self._entailment_id = None
         
         # Define subject categories with their descriptions
         self.subjects = {
@@ -45,31 +97,374 @@ class TextClassifier:
             "environmental_science": "environmental issues, ecology, sustainability, climate change, natural resources, conservation"
         }
         
+        # Scores of every subject for recently seen texts, keyed by preprocessed text
+        self._score_vector = functools.lru_cache(maxsize=1024)(self._compute_scores)
+        
+        self._index_subjects()
+        self._build_keyword_index()
         self._load_model()
     
+    def _index_subjects(self):
+        """
+        Freeze subject names and descriptions into parallel tuples
+        
+        Score vectors, cached hypotheses and cached embeddings all follow
+        the order of self._names. Must be called whenever self.subjects changes.
+        """
+        self._names = tuple(self.subjects)
+        self._descs = tuple(self.subjects.values())
+        self._name_to_idx = {name: i for i, name in enumerate(self._names)}
+    
+    def _compute_scores(self, cleaned_text: str) -> np.ndarray:
+        """
+        Score preprocessed text against every subject
+        
+        Called through self._score_vector, which caches the results.
+        
+        Args:
+            cleaned_text: Preprocessed text
+            
+        Returns:
+            Read-only array with the score of each subject (in self._names order)
+        """
+        if self.encoder:
+            scores = np.array(self._embedding_scores([cleaned_text])[0])
+        else:
+            scores = np.array(self._nli_scores([cleaned_text])[0])
+        scores.flags.writeable = False
+        return scores
+    
+    def _build_keyword_index(self):
+        """Map each keyword of the subject names and descriptions to its subjects"""
+        index = {}
+        for subject, description in zip(self._names, self._descs):
+            words = set(subject.split('_')) | set(description.replace(',', ' ').split())
+            for word in words - _STOPWORDS:
+                index.setdefault(word, []).append(subject)
+        self._kw_index = index
+    
+    def _keyword_match(self, cleaned_text: str) -> Optional[Tuple[str, float]]:
+        """
+        Classify preprocessed text by keyword hits alone, if the result is clear-cut
+        
+        Args:
+            cleaned_text: Preprocessed text
+            
+        Returns:
+            Tuple of (subject, KEYWORD_CONFIDENCE), or None if the keywords are ambiguous
+        """
+        # Distinct words, so that one repeated generic keyword is not decisive
+        counts = Counter()
+        for word in {word.strip(_WORD_PUNCTUATION) for word in cleaned_text.split()}:
+            counts.update(self._kw_index.get(word, ()))
+        
+        top = counts.most_common(2)
+        if not top or top[0][1] < self.KEYWORD_MIN_HITS:
+            return None
+        
+        runner_up = top[1][1] if len(top) > 1 else 0
+        if top[0][1] < self.KEYWORD_MIN_RATIO * runner_up:
+            return None
+        
+        return top[0][0], self.KEYWORD_CONFIDENCE
+    
     def _load_model(self):
+        """Load the classification model, reusing one already loaded by another instance"""
+        key = (self.model_name, self.embedding_model_name, self.onnx_model_dir, self.quantize_weights)
+        
+        with TextClassifier._MODEL_LOCK:
+            cached = TextClassifier._MODEL_CACHE.get(key)
+            if cached is None:
+                self._create_model()
+                # Failed loads are not cached so that later instances retry
+                if self.model is not None or self.encoder:
+                    TextClassifier._MODEL_CACHE[key] = (
+                        self.model, self.tokenizer, self.encoder, self.device, self._compiled
+                    )
+                return
+        
+        self.model, self.tokenizer, self.encoder, self.device, self._compiled = cached
+        
+        # Subjects can differ per instance, so their caches are rebuilt
+        if self.encoder:
+            self._cache_subject_embeddings()
+        if self.model is not None:
+            self._cache_hypotheses()
+    
+    def _create_model(self):
         """Load the classification model"""
+        if self.embedding_model_name and self._load_encoder():
+            return
+        
+        # Imported here so that importing this module stays cheap
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        
+        # ONNX Runtime outperforms eager PyTorch on CPU
+        if self.onnx_model_dir and not torch.cuda.is_available() and self._load_onnx_model():
+            self._cache_hypotheses()
+            return
+        
         try:
             print("Loading classification model...")
-            self.classifier = pipeline(
-                "zero-shot-classification",
-                model=self.model_name,
-                device=0 if torch.cuda.is_available() else -1
+            self.device = 0 if torch.cuda.is_available() else -1
+            
+            # Half precision halves the weight traffic of every forward pass, but
+            # CPUs without native BF16 emulate it and run slower than float32
+            if self.device >= 0:
+                dtype = torch.float16
+            elif self._cpu_supports_bf16():
+                dtype = torch.bfloat16
+            else:
+                dtype = torch.float32
+            torch.set_float32_matmul_precision("high")
+            if self.device >= 0:
+                torch.backends.cuda.matmul.allow_tf32 = True
+                torch.backends.cudnn.allow_tf32 = True
+                torch.backends.cudnn.benchmark = True
+            
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.model = AutoModelForSequenceClassification.from_pretrained(
+                self.model_name,
+                torch_dtype=dtype
             )
+            self.model.to("cuda" if self.device >= 0 else "cpu")
+            # quanto has no fused int8 kernels on CPU, where it is slower than float32
+            if self.quantize_weights and self.device >= 0:
+                self._quantize_model()
             print("Model loaded successfully!")
         except Exception as e:
             print(f"Error loading model: {str(e)}")
             # Fallback to CPU-only model
             try:
-                self.classifier = pipeline(
-                    "zero-shot-classification",
-                    model=self.model_name,
-                    device=-1
-                )
+                self.device = -1
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
                 print("Model loaded on CPU!")
             except Exception as e2:
                 print(f"Failed to load model: {str(e2)}")
-                self.classifier = None
+                self.model = None
+                self.tokenizer = None
+        
+        if self.model is not None:
+            self._cache_hypotheses()
+            if self.device >= 0:
+                self._compile_model()
+    
+    def _load_onnx_model(self) -> bool:
+        """
+        Load the ONNX export of the zero-shot model with ONNX Runtime on CPU
+        
+        Returns:
+            True if loaded, False to fall back to PyTorch
+        """
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            from transformers import AutoTokenizer
+            
+            print("Loading ONNX classification model...")
+            self.device = -1
+            self.tokenizer = AutoTokenizer.from_pretrained(self.onnx_model_dir)
+            self.model = ORTModelForSequenceClassification.from_pretrained(
+                self.onnx_model_dir,
+                provider="CPUExecutionProvider"
+            )
+            print("Model loaded successfully!")
+            return True
+        except Exception as e:
+            print(f"Error loading ONNX model: {str(e)}")
+            self.model = None
+            self.tokenizer = None
+            return False
+    
+    def _compile_model(self):
+        """Compile the classification model and trigger compilation with a warmup pass"""
+        import torch
+        
+        eager_model = self.model
+        try:
+            self.model = torch.compile(self.model, mode="reduce-overhead", fullgraph=False)
+            self._compiled = True
+            # Compile the shapes used by classify_text and by classify_batch's default batches
+            warmup_text = "warmup text for compiling the classification model"
+            self._nli_scores([warmup_text])
+            self._nli_scores([warmup_text], self._nli_batch_size())
+            print("Model compiled!")
+        except Exception as e:
+            # Keep running eagerly
+            print(f"Could not compile model: {str(e)}")
+            self.model = eager_model
+            self._compiled = False
+    
+    def _load_encoder(self) -> bool:
+        """
+        Load the sentence embedding model
+        
+        Returns:
+            True if loaded, False to fall back to the zero-shot model
+        """
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+            
+            print("Loading embedding model...")
+            self.device = 0 if torch.cuda.is_available() else -1
+            self.encoder = SentenceTransformer(
+                self.embedding_model_name,
+                device="cuda" if self.device >= 0 else "cpu"
+            )
+            # Truncate texts like the NLI path does
+            if self.encoder.max_seq_length:
+                self.encoder.max_seq_length = min(self.encoder.max_seq_length, self.MAX_PREMISE_TOKENS)
+            self._cache_subject_embeddings()
+            print("Model loaded successfully!")
+            return True
+        except Exception as e:
+            print(f"Error loading embedding model: {str(e)}")
+            self.encoder = None
+            return False
+    
+    def _cache_subject_embeddings(self):
+        """Embed the subject descriptions once for reuse across calls"""
+        self._subject_embeddings = self.encoder.encode(
+            list(self._descs),
+            normalize_embeddings=True,
+            convert_to_tensor=True
+        )
+    
+    def _embedding_scores(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+        """
+        Score texts against every subject by embedding cosine similarity
+        
+        Args:
+            texts: Preprocessed texts to classify
+            batch_size: Number of texts per forward pass
+            
+        Returns:
+            For each text, the cosine similarity to each subject (in self._names order)
+        """
+        embeddings = self.encoder.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_tensor=True
+        )
+        return (embeddings @ self._subject_embeddings.T).tolist()
+    
+    def _cache_hypotheses(self):
+        """Tokenize the hypothesis of every subject once for reuse across calls"""
+        self._hypothesis_ids = [
+            self.tokenizer(f"This text is about {subject}.", add_special_tokens=False)['input_ids']
+            for subject in self._names
+        ]
+        
+        # Index of the entailment logit in the NLI model output
+        self._entailment_id = next(
+            (index for label, index in self.model.config.label2id.items()
+             if label.lower().startswith("entail")),
+            -1
+        )
+    
+    def _nli_batch_size(self) -> int:
+        """Default number of premises per NLI forward pass, from NLI_BATCH_PAIRS"""
+        return max(1, self.NLI_BATCH_PAIRS // len(self._names))
+    
+    def _nli_scores(self, premises: List[str], batch_size: int = 1) -> List[List[float]]:
+        """
+        Score premises against the cached hypothesis of every subject
+        
+        Only the premises are tokenized; each is paired with every cached
+        hypothesis and the pairs of batch_size premises run through the model
+        as one batch.
+        
+        Args:
+            premises: Preprocessed texts to classify
+            batch_size: Number of premises per forward pass
+            
+        Returns:
+            For each premise, the score of each subject (in self._names order), summing to 1
+        """
+        import torch
+        
+        # Leave room for the longest hypothesis and the special tokens
+        extra_length = (max(len(ids) for ids in self._hypothesis_ids)
+                        + self.tokenizer.num_special_tokens_to_add(pair=True))
+        max_premise_length = min(
+            self.MAX_PREMISE_TOKENS,
+            self.tokenizer.model_max_length - extra_length
+        )
+        all_premise_ids = self.tokenizer(
+            premises,
+            add_special_tokens=False,
+            truncation=True,
+            max_length=max_premise_length
+        )['input_ids']
+        
+        device = self.model.device
+        scores = []
+        for start in range(0, len(all_premise_ids), batch_size):
+            batch_ids = all_premise_ids[start:start + batch_size]
+            num_premises = len(batch_ids)
+            if self._compiled:
+                # Fill the last batch with empty premises so it keeps the compiled batch shape
+                batch_ids = batch_ids + [[]] * (batch_size - num_premises)
+            
+            # prepare_for_model also sets the hypothesis segment for models that use token_type_ids
+            pairs = [
+                self.tokenizer.prepare_for_model(premise_ids, hypothesis_ids)
+                for premise_ids in batch_ids
+                for hypothesis_ids in self._hypothesis_ids
+            ]
+            if self._compiled:
+                # A fixed sequence length reuses the graph compiled by the warmup pass
+                inputs = self.tokenizer.pad(
+                    pairs,
+                    padding='max_length',
+                    max_length=max_premise_length + extra_length,
+                    return_tensors="pt"
+                )
+            else:
+                inputs = self.tokenizer.pad(pairs, return_tensors="pt")
+            
+            if device.type == "cuda":
+                # Copy from pinned memory so the transfer runs asynchronously
+                inputs = {name: tensor.pin_memory().to(device, non_blocking=True) for name, tensor in inputs.items()}
+            else:
+                inputs = {name: tensor.to(device) for name, tensor in inputs.items()}
+            
+            # Inference mode skips autograd and version-counter bookkeeping
+            with torch.inference_mode():
+                logits = self.model(**inputs).logits
+            
+            # Same as the zero-shot pipeline: softmax of entailment logits across subjects
+            entailment_logits = logits[:, self._entailment_id].float().view(-1, len(self._hypothesis_ids))
+            # Kept on the device so that preparing the next batch overlaps this forward pass
+            scores.append(entailment_logits[:num_premises].softmax(dim=1))
+        
+        return torch.cat(scores).tolist()
+    
+    def _quantize_model(self):
+        """Quantize model weights to int8 with optimum-quanto"""
+        try:
+            from optimum.quanto import quantize, freeze, qint8
+            
+            quantize(self.model, weights=qint8)
+            freeze(self.model)
+            print("Model weights quantized to int8")
+        except Exception as e:
+            # Keep the unquantized weights
+            print(f"Could not quantize model: {str(e)}")
+    
+    def _cpu_supports_bf16(self) -> bool:
+        """Check whether the CPU has native BF16 instructions (AVX-512 BF16 or AMX)"""
+        import torch
+        
+        # Plain AVX-512 (Skylake, Cascade Lake) only emulates BF16, so it does not count
+        checks = ('_is_avx512_bf16_supported', '_is_amx_tile_supported')
+        try:
+            return any(getattr(torch.cpu, check)() for check in checks if hasattr(torch.cpu, check))
+        except RuntimeError:
+            return False
     
     def classify_text(self, text: str, confidence_threshold: float = 0.3) -> Tuple[str, float]:
         """
@@ -82,7 +477,7 @@ class TextClassifier:
         Returns:
             Tuple of (subject, confidence_score)
         """
-        if not self.classifier or not text.strip():
+        if (self.model is None and not self.encoder) or not text.strip():
             return "unknown", 0.0
         
         try:
@@ -92,48 +487,131 @@ class TextClassifier:
             if len(cleaned_text) < 10:  # Too short for reliable classification
                 return "unknown", 0.0
             
-            # Get candidate labels
-            candidate_labels = list(self.subjects.keys())
+            # Skip the model when keywords alone are decisive and confident enough
+            match = self._keyword_match(cleaned_text)
+            if match and match[1] >= confidence_threshold:
+                return match
             
             # Perform classification
-            result = self.classifier(
-                cleaned_text,
-                candidate_labels,
-                hypothesis_template="This text is about {}."
-            )
-            
-            # Get best match
-            best_label = result['labels'][0]
-            best_score = result['scores'][0]
+            scores = self._score_vector(cleaned_text)
             
-            # Check if confidence is above threshold
-            if best_score >= confidence_threshold:
-                return best_label, best_score
-            else:
-                return "unknown", best_score
+            return self._best_subject(self._names, scores, confidence_threshold)
                 
         except Exception as e:
             print(f"Error classifying text: {str(e)}")
             return "unknown", 0.0
     
-    def classify_multiple_texts(self, texts: List[str], confidence_threshold: float = 0.3) -> List[Tuple[str, str, float]]:
+    def classify_batch(self, texts: List[str], confidence_threshold: float = 0.3,
+                       batch_size: int = None) -> List[Tuple[str, float]]:
+        """
+        Classify several texts in batched forward passes
+        
+        Args:
+            texts: List of texts to classify
+            confidence_threshold: Minimum confidence score to accept classification
+            batch_size: Number of texts per forward pass (default: NLI_BATCH_PAIRS
+                premise/hypothesis pairs' worth of texts for the zero-shot model;
+                8 on CPU and 32 on GPU for the embedding model)
+            
+        Returns:
+            List of tuples (subject, confidence_score), in the same order as texts
+        """
+        results = [("unknown", 0.0)] * len(texts)
+        
+        if (self.model is None and not self.encoder):
+            return results
+        
+        # Group texts that are identical after preprocessing so each is classified once;
+        # texts too short for reliable classification stay unknown
+        groups = {}
+        for i, text in enumerate(texts):
+            cleaned_text = self._preprocess_text(text)
+            if len(cleaned_text) >= 10:
+                groups.setdefault(cleaned_text, []).append(i)
+        
+        # Skip the model for texts whose keywords alone are decisive and confident enough
+        unique = []
+        for cleaned_text, group in groups.items():
+            match = self._keyword_match(cleaned_text)
+            if match and match[1] >= confidence_threshold:
+                for i in group:
+                    results[i] = match
+            else:
+                unique.append(cleaned_text)
+        
+        if not unique:
+            return results
+        
+        if batch_size is None:
+            if self.encoder:
+                batch_size = 8 if self.device < 0 else 32
+            else:
+                batch_size = self._nli_batch_size()
+        
+        try:
+            if self.encoder:
+                all_scores = self._embedding_scores(unique, batch_size)
+            else:
+                all_scores = self._nli_scores(unique, batch_size)
+        except Exception as e:
+            # Score one text at a time so a failure (e.g. out of memory) only loses that text
+            print(f"Error classifying texts: {str(e)}")
+            all_scores = []
+            for cleaned_text in unique:
+                try:
+                    all_scores.append(self._score_vector(cleaned_text))
+                except Exception as e2:
+                    print(f"Error classifying text: {str(e2)}")
+                    all_scores.append(None)
+        
+        for cleaned_text, scores in zip(unique, all_scores):
+            if scores is not None:
+                result = self._best_subject(self._names, scores, confidence_threshold)
+                for i in groups[cleaned_text]:
+                    results[i] = result
+        
+        return results
+    
+    def _best_subject(self, labels: Sequence[str], scores: Sequence[float],
+                      confidence_threshold: float) -> Tuple[str, float]:
+        """
+        Pick the best subject from classification scores
+        
+        Args:
+            labels: Subject labels
+            scores: Score of each label
+            confidence_threshold: Minimum confidence score to accept classification
+            
+        Returns:
+            Tuple of (subject, confidence_score)
+        """
+        # Get best match
+        best_index = int(np.argmax(scores))
+        best_label = labels[best_index]
+        best_score = float(scores[best_index])
+        
+        # Check if confidence is above threshold
+        if best_score >= confidence_threshold:
+            return best_label, best_score
+        else:
+            return "unknown", best_score
+    
+    def classify_multiple_texts(self, texts: List[str], confidence_threshold: float = 0.3,
+                                batch_size: int = None) -> List[Tuple[str, str, float]]:
         """
         Classify multiple texts
         
         Args:
             texts: List of texts to classify
             confidence_threshold: Minimum confidence score
+            batch_size: Number of texts per forward pass (default: see classify_batch)
             
         Returns:
             List of tuples (text, subject, confidence_score)
         """
-        results = []
-        
-        for text in texts:
-            subject, confidence = self.classify_text(text, confidence_threshold)
-            results.append((text, subject, confidence))
+        results = self.classify_batch(texts, confidence_threshold, batch_size)
         
-        return results
+        return [(text, subject, confidence) for text, (subject, confidence) in zip(texts, results)]
     
     def _preprocess_text(self, text: str) -> str:
         """
@@ -145,20 +623,15 @@ class TextClassifier:
         Returns:
             Preprocessed text
         """
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        
-        # Remove special characters but keep important ones
-        text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)\[\]\{\}]', ' ', text)
+        # Remove special characters but keep important ones, then lowercase
+        text = _CLEAN_RE.sub(' ', text).lower()
         
-        # Convert to lowercase
-        text = text.lower()
+        # Split once, collapsing whitespace and dropping very short words
+        # (likely OCR artifacts) in the same pass
+        text = ' '.join([word for word in text.split() if len(word) > 2])
         
-        # Remove very short words (likely OCR artifacts)
-        words = text.split()
-        words = [word for word in words if len(word) > 2]
-        
-        return ' '.join(words)
+        # Bound the work done by the tokenizer and model on very long notes
+        return text[:self.MAX_TEXT_CHARS]
     
     def get_subject_description(self, subject: str) -> str:
         """
@@ -190,6 +663,14 @@ class TextClassifier:
             description: Description of what the subject covers
         """
         self.subjects[subject_name.lower()] = description
+        self._index_subjects()
+        self._build_keyword_index()
+        self._score_vector.cache_clear()
+        
+        if self.encoder:
+            self._cache_subject_embeddings()
+        if self.model is not None:
+            self._cache_hypotheses()
     
     def get_classification_confidence(self, text: str, subject: str) -> float:
         """
@@ -200,9 +681,9 @@ class TextClassifier:
             subject: Subject to check confidence for
             
         Returns:
-            Confidence score (0-1)
+            Confidence score (0-1) of the subject among all subjects
         """
-        if not self.classifier or subject not in self.subjects:
+        if (self.model is None and not self.encoder) or subject not in self.subjects:
             return 0.0
         
         try:
@@ -211,13 +692,8 @@ class TextClassifier:
             if len(cleaned_text) < 10:
                 return 0.0
             
-            result = self.classifier(
-                cleaned_text,
-                [subject],
-                hypothesis_template="This text is about {}."
-            )
-            
-            return result['scores'][0]
+            # Served from the cached score vector when the text was just classified
+            return float(self._score_vector(cleaned_text)[self._name_to_idx[subject]])
             
         except Exception as e:
             print(f"Error getting confidence: {str(e)}")